@@ -5,13 +5,20 @@ from game.components.inventory import Inventory
 from typing import Optional, Tuple, TYPE_CHECKING
 
 from game import colour, exceptions
+from game.entity import Item
 
 if TYPE_CHECKING:
     from game.engine import Engine
-    from game.entity import Actor, Entity, Item
+    from game.entity import Actor, Entity
+
+
+# How far the sound of a melee attack carries, waking dormant monsters
+MELEE_NOISE_RADIUS = 4
 
 
 class Action:
+    __slots__ = ("entity",)
+
     def __init__(self, entity: Actor) -> None:
         super().__init__()
         self.entity = entity
@@ -44,12 +51,13 @@ class PickupAction(Action):
         actor_location_y = self.entity.y
         Inventory = self.entity.inventory
 
-        for item in self.engine.game_map.items:
-            if actor_location_x == item.x and actor_location_y == item.y:
+        for item in self.engine.game_map.get_entities_at_location(
+                actor_location_x, actor_location_y):
+            if isinstance(item, Item):
                 if len(Inventory.items) >= Inventory.capacity:
                     raise exceptions.Impossible("Your inventory is full.")
 
-                self.engine.game_map.entities.remove(item)
+                self.engine.game_map.remove_entity(item)
                 item.parent = self.entity.inventory
                 Inventory.items.append(item)
 
@@ -157,6 +165,10 @@ class MeleeAction(ActionWithDirection):
         if not target:
             raise exceptions.Impossible("Nothing to attack.")
         
+        # Fighting is loud, and wakes up anything close by
+        self.engine.game_map.wake_actors_near(
+            target.x, target.y, MELEE_NOISE_RADIUS)
+
         damage = self.entity.fighter.power - target.fighter.defense
 
         attack_desc = f"{self.entity.name.capitalize()} attacks {target.name}"
@@ -184,7 +196,7 @@ class MoveAction(ActionWithDirection):
             raise exceptions.Impossible("That way is blocked.")
         if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
             raise exceptions.Impossible("That way is blocked.")
-        if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
+        if self.engine.game_map.is_blocked(dest_x, dest_y):
             raise exceptions.Impossible("That way is blocked.")
 
         self.entity.move(self.dx, self.dy)
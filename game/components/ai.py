@@ -2,10 +2,9 @@
 
 from __future__ import annotations
 
-import random
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from collections import deque
+from typing import Deque, List, Optional, Tuple, TYPE_CHECKING
 
-import numpy as np  # type: ignore
 import tcod
 
 from game.actions import (
@@ -21,25 +20,61 @@ if TYPE_CHECKING:
 
 
 class BaseAI(Action):
+    __slots__ = ("path", "path_target", "path_tiles_generation")
+
+    def __init__(self, entity: Actor):
+        super().__init__(entity)
+
+        # Path being followed, the destination it leads to and the tiles
+        # generation it was computed on. See next_step_to. No path is
+        # allocated until the first one is computed.
+        self.path: Optional[Deque[Tuple[int, int]]] = None
+        self.path_target: Optional[Tuple[int, int]] = None
+        self.path_tiles_generation = -1
 
     def perform(self) -> None:
         raise NotImplementedError()
 
+    def clone(self, entity: Actor) -> BaseAI:
+        """Return a fresh AI of the same kind controlling `entity`."""
+        return type(self)(entity)
+
+    def next_step_to(self, dest_x: int, dest_y: int) -> Optional[Tuple[int, int]]:
+        """
+        Return the next step on a path to the target position, or None if
+        there is no valid path
+
+        The cached path is reused while it still leads to the same target on
+        the same tiles, starts next to this entity and its next step is free.
+        Otherwise a new path is computed.
+        """
+        gamemap = self.entity.gamemap
+        path = self.path
+
+        if (
+                not path
+                or self.path_target != (dest_x, dest_y)
+                or self.path_tiles_generation != gamemap.tiles_generation
+                or max(abs(path[0][0] - self.entity.x),
+                       abs(path[0][1] - self.entity.y)) != 1
+                or gamemap.is_blocked(*path[0])
+                ):
+            path = self.path = deque(self.get_path_to(dest_x, dest_y))
+            self.path_target = dest_x, dest_y
+            self.path_tiles_generation = gamemap.tiles_generation
+
+        if path:
+            return path.popleft()
+        return None
+
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         """
         Compute and return a path to the target position
 
         If there is no valid path, then returns an empty list
         """
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype = np.int8)
-
-        # Checking against all existing entities in this level
-        for entity in self.entity.gamemap.entities:
-            # Adding a higher cost to encourage other entities to
-            # take the longer path around
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                cost[entity.x, entity.y] += 10
-        
+        cost = self.entity.gamemap.get_movement_cost()
+
         graph = tcod.path.SimpleGraph(cost = cost, cardinal = 2, diagonal = 3)
         pathfinder = tcod.path.Pathfinder(graph)
 
@@ -59,6 +94,8 @@ class ConfusedEnemy(BaseAI):
     randomly moving into, it will attack.
     """
 
+    __slots__ = ("previous_ai", "turns_remaining")
+
     def __init__(
             self, entity: Actor,
             previous_ai: Optional[BaseAI],
@@ -69,6 +106,10 @@ class ConfusedEnemy(BaseAI):
         self.previous_ai = previous_ai
         self.turns_remaining = turns_remaining
 
+    def clone(self, entity: Actor) -> ConfusedEnemy:
+        previous_ai = self.previous_ai.clone(entity) if self.previous_ai else None
+        return ConfusedEnemy(entity, previous_ai, self.turns_remaining)
+
     def perform(self) -> None:
         # Revert AI back to original state
         if self.turns_remaining <= 0:
@@ -78,17 +119,18 @@ class ConfusedEnemy(BaseAI):
             self.entity.ai = self.previous_ai
         else:
             # Pick a random direction
-            direction_x, direction_y = random.choice(
-                [
-                    (-1, -1),
-                    (0, -1),
-                    (1, -1),
-                    (-1, 0),
-                    (-1, 1),
-                    (-0, 1),
-                    (1, 1),
-                ]
-            )
+            directions = [
+                (-1, -1),
+                (0, -1),
+                (1, -1),
+                (-1, 0),
+                (-1, 1),
+                (-0, 1),
+                (1, 1),
+            ]
+            direction_x, direction_y = directions[
+                self.entity.gamemap.ai_rng.integers(len(directions))
+            ]
 
             self.turns_remaining -= 1
 
@@ -97,10 +139,12 @@ class ConfusedEnemy(BaseAI):
 
 
 class HostileEnemy(BaseAI):
-    
+    __slots__ = ("last_seen",)
+
     def __init__(self, entity: Actor):
         super().__init__(entity)
-        self.path: List[Tuple[int, int]] = []
+        # Where the player was last seen, followed once they are out of sight
+        self.last_seen: Optional[Tuple[int, int]] = None
 
     def perform(self) -> None:
         target = self.engine.player
@@ -114,12 +158,23 @@ class HostileEnemy(BaseAI):
             if distance <= 1:
                 return MeleeAction(self.entity, dx, dy).perform()
 
-            # player can see the entity, but too far away (move entity)
-            self.path = self.get_path_to(target.x, target.y)
+            # player can see the entity, but too far away (move entity
+            # downhill on the distance map shared by all hostiles)
+            self.last_seen = target.x, target.y
+            step = self.engine.get_step_towards_player(
+                self.entity.x, self.entity.y)
+        elif self.last_seen:
+            # Out of sight, head to where the player was last seen. Give up
+            # once there, or if there is no way there.
+            step = self.next_step_to(*self.last_seen)
+            if not step:
+                self.last_seen = None
+        else:
+            step = None
 
-        # if entity has a path, move
-        if self.path:
-            dest_x, dest_y = self.path.pop(0)
+        # if entity has somewhere to go, move
+        if step:
+            dest_x, dest_y = step
             return MoveAction(
                 self.entity, dest_x - self.entity.x, dest_y - self.entity.y
                 ).perform()
@@ -3,15 +3,34 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Dict, Tuple, TypeVar, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from game.engine import Engine
     from game.entity import Entity
     from game.game_map import GameMap
 
+C = TypeVar("C", bound="BaseComponent")
+
+# Slots of each component class, its bases' included, see slot_names
+_slot_names: Dict[type, Tuple[str, ...]] = {}
+
+
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Return the names of every slot declared by `cls` and its bases."""
+    names = _slot_names.get(cls)
+    if names is None:
+        names = _slot_names[cls] = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+            )
+    return names
+
 
 class BaseComponent:
+    __slots__ = ("parent",)
+
     parent: Entity  # Owning entity instance.
 
     @property
@@ -21,3 +40,17 @@ class BaseComponent:
     @property
     def engine(self) -> Engine:
         return self.gamemap.engine
+
+    def clone(self: C, parent: Entity) -> C:
+        """Return a copy of this component owned by `parent`.
+
+        Field values are shared with this component rather than copied, which
+        suits components holding numbers, strings and other immutable data.
+        Components holding mutable containers override this.
+        """
+        clone = object.__new__(type(self))
+        for name in slot_names(type(self)):
+            if name != "parent" and hasattr(self, name):
+                object.__setattr__(clone, name, getattr(self, name))
+        clone.parent = parent
+        return clone
@@ -19,6 +19,8 @@ if TYPE_CHECKING:
     from entity import Actor, Item
 
 class Consumable(BaseComponent):
+    __slots__ = ()
+
     parent: Item
 
     def get_action(self, consumer: Actor) -> Optional[ActionOrHandler]:
@@ -41,6 +43,8 @@ class Consumable(BaseComponent):
 
 
 class ConfusionConsumable(Consumable):
+    __slots__ = ("number_of_turns",)
+
     def __init__(self, number_of_turns: int) -> None:
         self.number_of_turns = number_of_turns
 
@@ -77,6 +81,8 @@ class ConfusionConsumable(Consumable):
 
 
 class HealingConsumable(Consumable):
+    __slots__ = ("amount",)
+
     def __init__(self, amount: int):
         self.amount = amount
 
@@ -95,6 +101,8 @@ class HealingConsumable(Consumable):
 
 
 class FireballDamageConsumable(Consumable):
+    __slots__ = ("damage", "radius")
+
     def __init__(self, damage: int, radius: int):
         self.damage = damage
         self.radius = radius
@@ -115,9 +123,22 @@ class FireballDamageConsumable(Consumable):
         if not self.engine.game_map.visible[target_xy]:
             raise Impossible("You cannot target an area you cannot see.")
 
+        game_map = self.engine.game_map
+        # The blast is heard well beyond its radius
+        game_map.wake_actors_near(*target_xy, self.radius * 3)
+        if game_map.entity_store is not None:
+            actors_hit = game_map.entity_store.get_entities(
+                game_map.entity_store.actor_rows_within(*target_xy, self.radius)
+                )
+        else:
+            actors_hit = [
+                actor for actor in game_map.actors
+                if actor.distance(*target_xy) <= self.radius
+                ]
+
         targets_hit = False
-        for actor in self.engine.game_map.actors:
-            if actor.distance(*target_xy) <= self.radius:
+        for actor in actors_hit:
+            if actor.is_alive:
                 self.engine.message_log.add_message(
                     f"The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!"
                 )
@@ -130,6 +151,8 @@ class FireballDamageConsumable(Consumable):
 
 
 class LightningDamageConsumable(Consumable):
+    __slots__ = ("damage", "maximum_range")
+
     def __init__(self, damage: int, maximum_range: int):
         self.damage = damage
         self.maximum_range = maximum_range
@@ -139,17 +162,28 @@ class LightningDamageConsumable(Consumable):
         target = None
         closest_distance = self.maximum_range + 1.0
 
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.parent.gamemap.visible[
-                    actor.x, actor.y
-                    ]:
-                distance = consumer.distance(actor.x, actor.y)
+        game_map = self.engine.game_map
+        store = game_map.entity_store
+        if store is not None:
+            mask = store.visible_mask(game_map.visible)
+            if consumer in store:
+                mask[store.rows[consumer]] = False
+            row = store.closest_actor_row(
+                consumer.x, consumer.y, closest_distance, mask)
+            if row is not None:
+                target = store.entities[row]
+        else:
+            for actor in game_map.actors:
+                if actor is not consumer and game_map.visible[actor.x, actor.y]:
+                    distance = consumer.distance(actor.x, actor.y)
 
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
+                    if distance < closest_distance:
+                        target = actor
+                        closest_distance = distance
 
         if target:
+            # The thunder wakes up the neighbourhood
+            game_map.wake_actors_near(target.x, target.y, self.maximum_range)
             self.engine.message_log.add_message(
                 f"A lightning bolt strikes the {target.name} with a loud thunder, for {self.damage} damage!"
                 )
@@ -13,6 +13,8 @@ if TYPE_CHECKING:
 
 
 class Equipment(BaseComponent):
+    __slots__ = ("weapon", "armor")
+
     parent: Actor
 
     def __init__(
@@ -23,6 +25,27 @@ class Equipment(BaseComponent):
         self.weapon = weapon
         self.armor = armor
 
+    def clone(self, parent: Actor) -> Equipment:
+        """Return a copy of this equipment for `parent`.
+
+        Equipped items are matched to their copies in the inventory of
+        `parent`, which must have been cloned first.
+        """
+        clone = Equipment()
+        clone.parent = parent
+        for slot in ("weapon", "armor"):
+            item = getattr(self, slot)
+            if item is None:
+                continue
+            if item in self.parent.inventory.items:
+                index = self.parent.inventory.items.index(item)
+                item = parent.inventory.items[index]
+            else:
+                item = item.clone()
+                item.parent = parent.inventory
+            setattr(clone, slot, item)
+        return clone
+
     @property
     def defense_bonus(self) -> int:
         bonus = 0
@@ -67,6 +90,7 @@ class Equipment(BaseComponent):
             self.unequip_from_slot(slot, add_message)
 
         setattr(self, slot, item)
+        self.parent.fighter.sync_stats()
 
         if add_message:
             self.equip_message(item.name)
@@ -78,6 +102,7 @@ class Equipment(BaseComponent):
             self.unequip_message(current_item.name)
 
         setattr(self, slot, None)
+        self.parent.fighter.sync_stats()
 
     def toggle_equip(
             self,
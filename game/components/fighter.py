@@ -14,13 +14,15 @@ if TYPE_CHECKING:
 
 
 class Fighter(BaseComponent):
+    __slots__ = ("max_hp", "_hp", "_base_defense", "_base_power")
+
     parent: Actor
 
     def __init__(self, hp: int, base_defense: int, base_power: int):
         self.max_hp = hp
         self._hp = hp
-        self.base_defense = base_defense
-        self.base_power = base_power
+        self._base_defense = base_defense
+        self._base_power = base_power
 
     @property
     def hp(self) -> int:
@@ -31,6 +33,28 @@ class Fighter(BaseComponent):
         self._hp = max(0, min(value, self.max_hp))
         if self._hp == 0 and self.parent.ai:
             self.die()
+        self.sync_stats()
+
+    # Stats mirrored by the map's EntityStore are written through their
+    # setters, so the store can't miss a change.
+
+    @property
+    def base_defense(self) -> int:
+        return self._base_defense
+
+    @base_defense.setter
+    def base_defense(self, value: int) -> None:
+        self._base_defense = value
+        self.sync_stats()
+
+    @property
+    def base_power(self) -> int:
+        return self._base_power
+
+    @base_power.setter
+    def base_power(self, value: int) -> None:
+        self._base_power = value
+        self.sync_stats()
 
     @property
     def defense(self) -> int:
@@ -54,6 +78,14 @@ class Fighter(BaseComponent):
         else:
             return 0
 
+    def sync_stats(self) -> None:
+        """Write the parent's current stats through to its map's indexes.
+
+        Prototypes which are not on a map yet are skipped.
+        """
+        if hasattr(self.parent, "parent"):
+            self.gamemap.update_entity(self.parent)
+
     def die(self) -> None:
         if self.engine.player is self.parent:
             death_message = "You died!"
@@ -10,12 +10,24 @@ if TYPE_CHECKING:
     from game.entity_factories import Actor, Item
 
 class Inventory(BaseComponent):
+    __slots__ = ("capacity", "items")
+
     parent: Actor
 
     def __init__(self, capacity: int):
         self.capacity = capacity
         self.items: List[Item] = []
 
+    def clone(self, parent: Actor) -> Inventory:
+        """Return a copy of this inventory, holding copies of its items."""
+        clone = Inventory(self.capacity)
+        clone.parent = parent
+        for item in self.items:
+            item_clone = item.clone()
+            item_clone.parent = clone
+            clone.items.append(item_clone)
+        return clone
+
     def drop(self, item: Item) -> None:
         """
         Removes an item from the inventory and restores it to the game map,
@@ -12,6 +12,11 @@ if TYPE_CHECKING:
 
 
 class Level(BaseComponent):
+    __slots__ = (
+        "current_level", "current_xp", "level_up_base", "level_up_factor",
+        "xp_given",
+        )
+
     parent: Actor
 
     def __init__(
@@ -5,14 +5,16 @@ from game.render_functions import render_bar, render_names_at_mouse_loc
 
 import lzma
 import pickle
-from typing import TYPE_CHECKING
+from typing import Any, Dict, Hashable, Optional, Tuple, TYPE_CHECKING
 
+import numpy as np
+import tcod
 from tcod.console import Console
-from tcod.map import compute_fov
 
-from game import exceptions
+from game import colour, exceptions
 
 from game.message_log import MessageLog
+from game.profiling import PhaseTimings
 from game import render_functions
 
 if TYPE_CHECKING:
@@ -20,6 +22,19 @@ if TYPE_CHECKING:
     from game.game_map import GameMap, GameWorld
 
 
+FOV_RADIUS = 8
+
+# Dormant monsters this close to the player wake up. Matches the FOV radius,
+# so a monster the player can see is always awake.
+WAKE_RADIUS = FOV_RADIUS
+
+# Steps to the eight neighbouring tiles, cardinals first
+DIRECTIONS = (
+    (0, -1), (0, 1), (-1, 0), (1, 0),
+    (-1, -1), (1, -1), (-1, 1), (1, 1),
+    )
+
+
 class Engine:
     game_map: GameMap
     game_world: GameWorld
@@ -28,56 +43,210 @@ class Engine:
         self.message_log = MessageLog()
         self.mouse_location = (0, 0)
         self.player = player
+
+        # Distance map rooted at the player, shared by every hostile during
+        # the enemy turn. Computed lazily, see player_distance_map.
+        self._player_distance_map: Optional[np.ndarray] = None
+
+        # Inputs each screen region was last rendered with, see render
+        self._region_keys: Dict[str, Hashable] = {}
+
+        # Rolling timings of each phase of a turn and a frame, shown by the
+        # debug overlay when show_timings is set
+        self.timings = PhaseTimings()
+        self.show_timings = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Transient, rebuilt on demand after loading
+        state["_player_distance_map"] = None
+        state["_region_keys"] = {}
+        state["timings"] = PhaseTimings()
+        return state
     
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
-            if entity.ai:
-                try:
-                    entity.ai.perform()
-                except exceptions.Impossible:
-                    pass # Ignore impossible action exceptions from AI
+        """Run every actor turn that comes before the player's next turn."""
+        self._player_distance_map = None
+        self.game_map.wake_actors_near(self.player.x, self.player.y, WAKE_RADIUS)
+        scheduler = self.game_map.scheduler
+
+        if self.player not in scheduler:
+            scheduler.schedule(self.player)
+
+        while True:
+            entity = scheduler.pop()
+            if entity is None or entity is self.player:
+                break
+            if not entity.ai:
+                continue  # Died since its turn was scheduled
+
+            try:
+                entity.ai.perform()
+            except exceptions.Impossible:
+                pass # Ignore impossible action exceptions from AI
+
+            if entity.is_alive and entity.gamemap is self.game_map:
+                scheduler.schedule(entity)
+
+        # The player's next turn comes after the time this action took
+        scheduler.schedule(self.player)
+        self._player_distance_map = None
+
+    @property
+    def player_distance_map(self) -> np.ndarray:
+        """Return the path distance from the player to every tile.
+
+        Computed at most once per enemy turn, and only once a hostile asks.
+        """
+        if self._player_distance_map is None:
+            graph = tcod.path.SimpleGraph(
+                cost = self.game_map.get_movement_cost(),
+                cardinal = 2,
+                diagonal = 3,
+                )
+            pathfinder = tcod.path.Pathfinder(graph)
+            pathfinder.add_root((self.player.x, self.player.y))
+            pathfinder.resolve()
+            self._player_distance_map = pathfinder.distance
+        return self._player_distance_map
+
+    def get_step_towards_player(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Return the neighbouring tile of (x, y) which goes furthest
+        downhill on the player distance map.
+
+        Tiles held by blocking entities are skipped. Returns None if no
+        free neighbour is closer to the player than (x, y) is.
+        """
+        distance_map = self.player_distance_map
+        game_map = self.game_map
+
+        best_step = None
+        best_distance = distance_map[x, y]
+        for dx, dy in DIRECTIONS:
+            dest_x, dest_y = x + dx, y + dy
+            if not game_map.in_bounds(dest_x, dest_y):
+                continue
+            distance = distance_map[dest_x, dest_y]
+            if distance < best_distance and not game_map.is_blocked(dest_x, dest_y):
+                best_step = dest_x, dest_y
+                best_distance = distance
+        return best_step
 
     def update_fov(self) -> None:
         """Recompute the visible area based on the player's point of view"""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
-            (self.player.x, self.player.y),
-            radius=8,
-            )
-
-        # Add visible tiles to explored
-        self.game_map.explored |= self.game_map.visible
+        self.game_map.update_fov(self.player.x, self.player.y, FOV_RADIUS)
     
-    def render(self, console: Console) -> None:
-        self.game_map.render(console)
-
-        self.message_log.render(
-            console = console,
-            x = 21,
-            y = 45,
-            width = 40,
-            height = 5
+    def _region_needs_render(
+            self,
+            console: Console,
+            name: str,
+            key: Hashable,
+            area: Optional[Tuple[int, int, int, int]],
+            dirty_only: bool,
+            ) -> bool:
+        """Return True if the named screen region has to be drawn.
+
+        When only dirty regions are drawn, a region is skipped if its inputs
+        `key` are the same as last time, otherwise its `area` is cleared.
+        """
+        if dirty_only:
+            if self._region_keys.get(name) == key:
+                return False
+            if area is not None:
+                console.draw_rect(
+                    *area, ch = ord(" "), fg = colour.white, bg = colour.black)
+        self._region_keys[name] = key
+        return True
+
+    def render(self, console: Console, dirty_only: bool = False) -> bool:
+        """Render the game onto the console.
+
+        If `dirty_only` is True the console must still hold the last frame
+        this engine rendered, and only the regions whose inputs changed since
+        are redrawn. Returns True if anything was drawn.
+        """
+        game_map = self.game_map
+        map_key = (
+            id(game_map),
+            game_map.tiles_generation,
+            game_map.visible_generation,
+            game_map.entities_generation,
             )
-
-        render_functions.render_bar(
-            console = console,
-            current_value = self.player.fighter.hp,
-            maximum_value = self.player.fighter.max_hp,
-            total_width = 20,
-        )
-
-        render_functions.render_dungeon_level(
-            console = console,
-            dungeon_level = self.game_world.current_floor,
-            location = (0, 47),
-            )
-
-        render_functions.render_names_at_mouse_loc(
-            console = console,
-            x = 21,
-            y = 44,
-            engine = self
+        drawn = False
+
+        # The map covers its whole area, so it does not need clearing
+        if self._region_needs_render(console, "map", map_key, None, dirty_only):
+            game_map.render(console)
+            drawn = True
+
+        if self._region_needs_render(
+                console, "message_log", self.message_log.generation,
+                (21, 45, 40, 5), dirty_only):
+            self.message_log.render(
+                console = console,
+                x = 21,
+                y = 45,
+                width = 40,
+                height = 5
+                )
+            drawn = True
+
+        if self._region_needs_render(
+                console, "hp_bar",
+                (self.player.fighter.hp, self.player.fighter.max_hp),
+                (0, 45, 20, 1), dirty_only):
+            render_functions.render_bar(
+                console = console,
+                current_value = self.player.fighter.hp,
+                maximum_value = self.player.fighter.max_hp,
+                total_width = 20,
             )
+            drawn = True
+
+        if self._region_needs_render(
+                console, "dungeon_level", self.game_world.current_floor,
+                (0, 47, 20, 1), dirty_only):
+            render_functions.render_dungeon_level(
+                console = console,
+                dungeon_level = self.game_world.current_floor,
+                location = (0, 47),
+                )
+            drawn = True
+
+        names_at_mouse_location = render_functions.get_names_at_location(
+            *self.mouse_location, game_map)
+        if self._region_needs_render(
+                console, "names_at_mouse", names_at_mouse_location,
+                (21, 44, console.width - 21, 1), dirty_only):
+            render_functions.render_names_at_mouse_loc(
+                console = console,
+                x = 21,
+                y = 44,
+                engine = self
+                )
+            drawn = True
+
+        # The overlay changes with every timed frame, so it is only keyed on
+        # its numbers while shown. Hiding it clears its area once.
+        timings_key = None
+        if self.show_timings:
+            timings_key = tuple(
+                round(value, 1)
+                for phase, _ in render_functions.TIMING_PHASES
+                for value in self.timings.stats(phase).values()
+                )
+        if self._region_needs_render(
+                console, "timings", timings_key,
+                (61, 45, console.width - 61, 5), dirty_only):
+            if self.show_timings:
+                render_functions.render_timings(
+                    console = console,
+                    timings = self.timings,
+                    location = (61, 45),
+                    )
+            drawn = True
+
+        return drawn
 
     def save_as(self, filename: str) -> None:
         """Save this Engine instance as a compressed file."""
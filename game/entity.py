@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import copy
 import math
 from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
 
@@ -26,6 +25,11 @@ class Entity:
     A generic object to represent players, enemies, items, etc.
     """
 
+    __slots__ = (
+        "x", "y", "char", "colour", "name", "blocks_movement", "render_order",
+        "parent",
+        )
+
     parent: Union[GameMap, Inventory]
 
     def __init__(
@@ -49,31 +53,47 @@ class Entity:
         if parent:
             # if parent isn't provided now then it will be set later
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     @property
     def gamemap(self):
         return self.parent.gamemap
 
+    def clone(self: T) -> T:
+        """Return a copy of this entity which is not placed anywhere yet.
+
+        Immutable field values such as the name, glyph and colour are reused
+        as they are, without walking them the way copy.deepcopy does. The
+        components get their own copies.
+        """
+        clone = object.__new__(type(self))
+        clone.x = self.x
+        clone.y = self.y
+        clone.char = self.char
+        clone.colour = self.colour
+        clone.name = self.name
+        clone.blocks_movement = self.blocks_movement
+        clone.render_order = self.render_order
+        return clone
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int) -> T:
         """Spawn a copy of this instance at the given location."""
-        clone = copy.deepcopy(self)
+        clone = self.clone()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
 
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         """Place this entity at a new location. Handles moving across GameMaps."""
-        self.x = x
-        self.y = y
-
         if hasattr(self, "parent"):
             if self.parent is self.gamemap:
-                self.gamemap.entities.remove(self)
+                self.gamemap.remove_entity(self)
+        self.x = x
+        self.y = y
         self.parent = gamemap
-        gamemap.entities.add(self)
+        gamemap.add_entity(self)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -82,11 +102,12 @@ class Entity:
         return math.sqrt((x - self.x) ** 2 + (y - self.y) ** 2)
 
     def move(self, dx: int, dy: int) -> None:
-        self.x += dx
-        self.y += dy
+        self.gamemap.move_entity(self, self.x + dx, self.y + dy)
 
 
 class Actor(Entity):
+    __slots__ = ("ai", "equipment", "fighter", "inventory", "level", "speed")
+
     def __init__(
             self,
             *,
@@ -100,6 +121,7 @@ class Actor(Entity):
             fighter: Fighter,
             inventory: Inventory,
             level: Level,
+            speed: int = 100,
             ):
 
         super().__init__(
@@ -126,6 +148,20 @@ class Actor(Entity):
         self.level = level
         self.level.parent = self
 
+        # Energy regained per tick, see game.scheduler
+        self.speed = speed
+
+    def clone(self) -> Actor:
+        clone = super().clone()
+        clone.speed = self.speed
+        clone.fighter = self.fighter.clone(clone)
+        clone.level = self.level.clone(clone)
+        # Equipped items are looked up in the inventory, so it comes first
+        clone.inventory = self.inventory.clone(clone)
+        clone.equipment = self.equipment.clone(clone)
+        clone.ai = self.ai.clone(clone) if self.ai else None
+        return clone
+
     @property
     def is_alive(self) -> bool:
         """Returns True as long this actor can perform actions."""
@@ -133,6 +169,8 @@ class Actor(Entity):
 
 
 class Item(Entity):
+    __slots__ = ("consumable", "equippable")
+
     def __init__(
             self,
             *,
@@ -165,3 +203,11 @@ class Item(Entity):
         if self.equippable:
             self.equippable.parent = self
 
+    def clone(self) -> Item:
+        clone = super().clone()
+        clone.consumable = (
+            self.consumable.clone(clone) if self.consumable else None)
+        clone.equippable = (
+            self.equippable.clone(clone) if self.equippable else None)
+        return clone
+
@@ -1,5 +1,6 @@
 # game/entity_factories.py
 
+from typing import Dict
 
 from game.components.ai import HostileEnemy
 from game.components import consumable, equippable
@@ -7,7 +8,7 @@ from game.components.equipment import Equipment
 from game.components.fighter import Fighter
 from game.components.inventory import Inventory
 from game.components.level import Level
-from game.entity import Actor, Item
+from game.entity import Actor, Entity, Item
 
 player = Actor(
     char = "@", 
@@ -100,3 +101,22 @@ chain_mail = Item(
     name = "Chain Mail",
     equippable = equippable.ChainMail()
 )
+
+
+# Every prototype by a stable identifier, the name of its module attribute,
+# for looking prototypes up from data such as saved settings or config files.
+# Code refers to the module attributes directly. Spawned entities are clones
+# of these, see Entity.clone.
+prototypes: Dict[str, Entity] = {
+    "player": player,
+    "orc": orc,
+    "troll": troll,
+    "confusion_scroll": confusion_scroll,
+    "fireball_scroll": fireball_scroll,
+    "health_potion": health_potion,
+    "lightning_scroll": lightning_scroll,
+    "dagger": dagger,
+    "sword": sword,
+    "leather_armor": leather_armor,
+    "chain_mail": chain_mail,
+}
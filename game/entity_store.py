@@ -0,0 +1,159 @@
+# game/entity_store.py
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from game.entity import Entity
+
+
+# Column name -> dtype for every per-entity array kept by the store
+columns_dt = {
+    "x": np.int32,
+    "y": np.int32,
+    "hp": np.int32,
+    "power": np.int32,
+    "defense": np.int32,
+    "blocks_movement": np.bool_,
+    "render_order": np.int8,
+    "ch": np.int32,  # glyph codepoint
+    "fg": np.dtype((np.uint8, 3)),  # glyph colour
+    "alive": np.bool_,  # living actor, able to take turns
+    "in_use": np.bool_,  # row currently belongs to an entity
+}
+
+
+class EntityStore:
+    """
+    Struct-of-arrays mirror of the entities on a GameMap.
+
+    Each entity on the map owns one row across contiguous NumPy columns, so
+    systems can query positions and combat stats of every entity at once
+    instead of walking the object graph. The entity objects remain the source
+    of truth; the GameMap and the components write their changes through to
+    the store with `add`, `remove`, `move` and `update`.
+
+    The store is a mirror rather than the storage behind Actor and Fighter,
+    so entities keep working off a map, as prototypes or in an inventory, and
+    pickle as plain objects. Fighter writes its stats through property
+    setters, and Equipment syncs when the bonuses change. Only the area
+    effects of consumables and the rendering query the store; the AI still
+    tests ranges on the entity objects.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.entities: List[Optional[Entity]] = [None] * capacity
+        self.rows: Dict[Entity, int] = {}
+        self._free_rows: List[int] = list(range(capacity - 1, -1, -1))
+
+        for name, dtype in columns_dt.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity in self.rows
+
+    def _grow(self) -> None:
+        """Double the capacity of every column."""
+        old_capacity = self.capacity
+        self.capacity *= 2
+
+        for name, dtype in columns_dt.items():
+            column = np.zeros(self.capacity, dtype=dtype)
+            column[:old_capacity] = getattr(self, name)
+            setattr(self, name, column)
+
+        self.entities.extend([None] * old_capacity)
+        self._free_rows.extend(range(self.capacity - 1, old_capacity - 1, -1))
+
+    def add(self, entity: Entity) -> int:
+        """Assign a row to this entity and fill it in. Returns the row."""
+        if not self._free_rows:
+            self._grow()
+
+        row = self._free_rows.pop()
+        self.rows[entity] = row
+        self.entities[row] = entity
+        self.in_use[row] = True
+        self.move(entity)
+        self.update(entity)
+        return row
+
+    def remove(self, entity: Entity) -> None:
+        """Release the row held by this entity."""
+        row = self.rows.pop(entity)
+        self.entities[row] = None
+        self.in_use[row] = False
+        self.alive[row] = False
+        self.blocks_movement[row] = False
+        self._free_rows.append(row)
+
+    def move(self, entity: Entity) -> None:
+        """Copy the entity's current position into its row."""
+        row = self.rows[entity]
+        self.x[row] = entity.x
+        self.y[row] = entity.y
+
+    def update(self, entity: Entity) -> None:
+        """Copy the entity's current flags, glyph and combat stats into its row.
+
+        Entities that are not in this store are ignored.
+        """
+        row = self.rows.get(entity)
+        if row is None:
+            return
+
+        self.blocks_movement[row] = entity.blocks_movement
+        self.render_order[row] = entity.render_order.value
+        self.ch[row] = ord(entity.char)
+        self.fg[row] = entity.colour
+
+        fighter = getattr(entity, "fighter", None)
+        if fighter is not None:
+            self.hp[row] = fighter.hp
+            self.power[row] = fighter.power
+            self.defense[row] = fighter.defense
+            self.alive[row] = entity.is_alive
+        else:
+            self.hp[row] = self.power[row] = self.defense[row] = 0
+            self.alive[row] = False
+
+    def get_entities(self, rows: np.ndarray) -> List[Entity]:
+        """Return the entities owning the given rows, in row order."""
+        return [self.entities[row] for row in rows.tolist()]
+
+    def visible_mask(self, visible: np.ndarray) -> np.ndarray:
+        """Return a mask of the rows whose entity stands on a visible tile."""
+        return self.in_use & visible[self.x, self.y]
+
+    def actor_rows_within(self, x: int, y: int, radius: float) -> np.ndarray:
+        """Return the rows of living actors within `radius` of (x, y)."""
+        distance_sq = (self.x - x) ** 2 + (self.y - y) ** 2
+        return np.flatnonzero(self.alive & (distance_sq <= radius ** 2))
+
+    def closest_actor_row(
+            self,
+            x: int,
+            y: int,
+            max_distance: float,
+            mask: Optional[np.ndarray] = None,
+            ) -> Optional[int]:
+        """Return the row of the closest living actor to (x, y).
+
+        Only actors strictly closer than `max_distance` and inside the
+        optional `mask` are considered. Returns None if there is no such actor.
+        """
+        candidates = self.alive if mask is None else self.alive & mask
+        distance_sq = ((self.x - x) ** 2 + (self.y - y) ** 2).astype(np.float64)
+        distance_sq[~candidates] = np.inf
+
+        row = int(np.argmin(distance_sq))
+        if distance_sq[row] >= max_distance ** 2:
+            return None
+        return row
@@ -9,3 +9,10 @@ class Impossible(Exception):
 
 class QuitWithoutSaving(SystemExit):
     """Can be raised to exit the game without automatically saving."""
+
+
+class IncompatibleSave(Exception):
+    """Exception raised when a save cannot be restored by the current code.
+
+    Reason provided as the exception message.
+    """
@@ -2,71 +2,388 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import random
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
 
 import numpy as np
 from tcod.console import Console
+from tcod.map import compute_fov
 
 from game.entity import Actor, Item
-from game import tile_types
+from game.entity_store import EntityStore
+from game.render_order import RenderOrder
+from game.scheduler import TurnScheduler
+from game import exceptions, tile_types
 
 if TYPE_CHECKING:
     from game.engine import Engine
     from game.entity import Entity
+    from game.procgen import Layout
+
+
+# Number of recent FOV results each map keeps for reuse
+FOV_CACHE_SIZE = 32
+
+FovKey = Tuple[int, int, int, int]  # x, y, radius, tiles generation
+
+def tiles_checksum(tiles: np.ndarray) -> str:
+    """Return a short checksum of a tiles array."""
+    return hashlib.blake2b(tiles.tobytes(), digest_size=8).hexdigest()
+
+
+# Generates the next floor while the player explores the current one
+_floor_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="floor-generation")
+
 
 class GameMap:
     def __init__(
             self, engine: Engine, width: int, height: int,
-            entities: Iterable[Entity] = ()):
+            entities: Iterable[Entity] = (),
+            use_entity_store: bool = True):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
+        self.entities = set()
+        self.entities_generation = 0  # Bumped whenever an entity changes
+
+        # Entities on each occupied (x, y) cell, for O(1) point lookups.
+        # Kept up to date by add_entity, remove_entity and move_entity.
+        self._entities_by_location: Dict[Tuple[int, int], List[Entity]] = {}
+
+        # Optional array-backed copy of positions and stats for vectorized
+        # queries over every entity on the map.
+        self.entity_store: Optional[EntityStore] = (
+            EntityStore() if use_entity_store else None)
+
+        # Number of movement-blocking entities on each tile, shared by
+        # movement checks and pathfinding.
+        self.occupancy = np.zeros((width, height), dtype=np.int8, order="F")
+        self._blocking_entities: Set[Entity] = set()
+
+        # Entities split by kind, so hot paths only visit the population
+        # they need.
+        self._live_actors: Set[Actor] = set()
+        self._corpses: Set[Actor] = set()
+        self._items: Set[Item] = set()
+
+        # Turn order of the living actors on this map
+        self.scheduler = TurnScheduler()
 
+        # Actors asleep until woken, kept off the scheduler so they cost
+        # nothing per turn, and the number of them on each tile.
+        self._dormant_actors: Set[Actor] = set()
+        self.dormant_count = np.zeros((width, height), dtype=np.int8, order="F")
+
+        # Write tiles through set_tiles, so caches derived from them are
+        # invalidated.
         self.tiles = np.full(
             (width, height),
             fill_value=tile_types.wall, order="F")
+        self.tiles_generation = 0  # Bumped on every write to tiles
+
+        # Walkable cost cached per tiles generation, and a reused buffer the
+        # dynamic costs are overlaid on.
+        self._base_cost: Optional[np.ndarray] = None
+        self._base_cost_generation = -1
+        self._cost_scratch: Optional[np.ndarray] = None
         self.visible = np.full(
             (width, height), fill_value=False, order="F"
             )  # Visible to player
         self.explored = np.full(
             (width, height), fill_value=False, order="F"
             )  # previously explored
+        self.visible_generation = 0  # Bumped whenever visible changes
+
+        # Recently computed FOVs, least recently used first, and the key of
+        # the one currently in visible.
+        self._fov_cache: OrderedDict[FovKey, np.ndarray] = OrderedDict()
+        self._fov_key: Optional[FovKey] = None
+
+        # Light/dark/shroud graphics of every tile, rebuilt by render only
+        # when the tiles or the FOV changed.
+        self._composite: Optional[np.ndarray] = None
+        self._composite_key: Optional[Tuple[int, int]] = None
 
         self.downstairs_location = (0, 0)
+        self.start_location = (0, 0)  # Where the player arrives on this map
+
+        # Layout the tiles were dug from, the tiles generation right after and
+        # the checksum of the tiles it dug, so saves can store the tiles as
+        # changes to a regenerated layout. Set by procgen.dig_layout.
+        self.layout: Optional[Layout] = None
+        self.layout_tiles_generation = -1
+        self.layout_checksum: Optional[str] = None
+
+        # Random stream of the AI acting on this map. A NumPy Generator, as its
+        # state is far smaller to save than a random.Random's.
+        self.ai_rng = np.random.default_rng()
+
+        for entity in entities:
+            self.add_entity(entity)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Caches are rebuilt on demand after loading
+        state["_base_cost"] = None
+        state["_base_cost_generation"] = -1
+        state["_cost_scratch"] = None
+        state["_fov_cache"] = OrderedDict()
+        state["_composite"] = None
+        state["_composite_key"] = None
+
+        # Tiles dug from a layout are saved as the tiles changed since
+        if self.layout is not None:
+            if self.tiles_generation == self.layout_tiles_generation:
+                changed = np.zeros((2, 0), dtype=np.intp)
+            else:
+                from game.procgen import generate_layout_tiles
+
+                generated = generate_layout_tiles(
+                    self.width, self.height, self.layout)
+                changed = np.nonzero(self.tiles != generated)
+            state["tiles"] = None
+            state["_tile_changes"] = (*changed, self.tiles[tuple(changed)])
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        tile_changes = state.pop("_tile_changes", None)
+        self.__dict__.update(state)
+        if self.tiles is None:
+            from game.procgen import generate_layout_tiles
+
+            self.tiles = generate_layout_tiles(self.width, self.height, self.layout)
+            # The entities and explored tiles of the save only line up with the
+            # tiles the save was made from
+            if tiles_checksum(self.tiles) != self.layout_checksum:
+                raise exceptions.IncompatibleSave(
+                    "This save was made by a version of the game which "
+                    "generated different maps.")
+            changed_x, changed_y, values = tile_changes
+            self.tiles[changed_x, changed_y] = values
 
     @property
     def gamemap(self) -> GameMap:
         return self
 
+    def set_tiles(self, index: Any, tile: np.ndarray) -> None:
+        """Write `tile` to `tiles[index]` and invalidate derived caches.
+
+        `index` is anything NumPy accepts: an (x, y) point, a pair of slices
+        for a rectangle, or a pair of coordinate arrays to write many scattered
+        tiles in one operation.
+        """
+        self.tiles[index] = tile
+        self.tiles_generation += 1
+
     @property
     def actors(self) -> Iterator[Actor]:
         """Iterate over this map's living actors."""
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-            )
+        return iter(self._live_actors)
+
+    @property
+    def corpses(self) -> Iterator[Actor]:
+        """Iterate over this map's dead actors."""
+        return iter(self._corpses)
 
     @property
     def items(self) -> Iterator[Item]:
-        yield from (entity for entity in
-                    self.entities if isinstance(entity, Item))
+        return iter(self._items)
+
+    def _bucket_for(self, entity: Entity) -> Optional[Set[Entity]]:
+        """Return the typed collection this entity currently belongs in."""
+        if isinstance(entity, Actor):
+            return self._live_actors if entity.is_alive else self._corpses
+        if isinstance(entity, Item):
+            return self._items
+        return None
+
+    def add_entity(self, entity: Entity) -> None:
+        """Add an entity to this map at its current location."""
+        self.entities.add(entity)
+        self.entities_generation += 1
+        self._entities_by_location.setdefault(
+            (entity.x, entity.y), []).append(entity)
+        bucket = self._bucket_for(entity)
+        if bucket is not None:
+            bucket.add(entity)
+        if bucket is self._live_actors:
+            self.scheduler.schedule(entity)
+        if entity.blocks_movement:
+            self._blocking_entities.add(entity)
+            self.occupancy[entity.x, entity.y] += 1
+        if self.entity_store is not None:
+            self.entity_store.add(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Remove an entity from this map."""
+        self.entities.remove(entity)
+        self.entities_generation += 1
+        self._unindex_location(entity)
+        for bucket in (self._live_actors, self._corpses, self._items):
+            bucket.discard(entity)
+        if isinstance(entity, Actor):
+            self.scheduler.unschedule(entity)
+        if entity in self._dormant_actors:
+            self._dormant_actors.remove(entity)
+            self.dormant_count[entity.x, entity.y] -= 1
+        if entity in self._blocking_entities:
+            self._blocking_entities.remove(entity)
+            self.occupancy[entity.x, entity.y] -= 1
+        if self.entity_store is not None:
+            self.entity_store.remove(entity)
+
+    def move_entity(self, entity: Entity, x: int, y: int) -> None:
+        """Move an entity already on this map to a new location."""
+        self.entities_generation += 1
+        self._unindex_location(entity)
+        if entity in self._blocking_entities:
+            self.occupancy[entity.x, entity.y] -= 1
+            self.occupancy[x, y] += 1
+        if entity in self._dormant_actors:
+            self.dormant_count[entity.x, entity.y] -= 1
+            self.dormant_count[x, y] += 1
+        entity.x, entity.y = x, y
+        self._entities_by_location.setdefault((x, y), []).append(entity)
+        if self.entity_store is not None:
+            self.entity_store.move(entity)
+
+    def update_entity(self, entity: Entity) -> None:
+        """Refresh the indexed state of an entity after its stats or flags
+        changed, such as damage, equipment or death.
+        """
+        self.entities_generation += 1
+        if entity.blocks_movement != (entity in self._blocking_entities):
+            if entity.blocks_movement:
+                self._blocking_entities.add(entity)
+                self.occupancy[entity.x, entity.y] += 1
+            else:
+                self._blocking_entities.remove(entity)
+                self.occupancy[entity.x, entity.y] -= 1
+        if entity in self._live_actors and not entity.is_alive:
+            self._live_actors.remove(entity)
+            self._corpses.add(entity)
+            if entity in self._dormant_actors:
+                self._dormant_actors.remove(entity)
+                self.dormant_count[entity.x, entity.y] -= 1
+        if self.entity_store is not None:
+            self.entity_store.update(entity)
+
+    def put_to_sleep(self, actor: Actor) -> None:
+        """Make an actor dormant, taking no turns until it is woken."""
+        if actor in self._dormant_actors or not actor.is_alive:
+            return
+        self._dormant_actors.add(actor)
+        self.dormant_count[actor.x, actor.y] += 1
+        self.scheduler.unschedule(actor)
+
+    def wake(self, actor: Actor) -> None:
+        """Wake a dormant actor, giving it turns again."""
+        self._dormant_actors.remove(actor)
+        self.dormant_count[actor.x, actor.y] -= 1
+        self.scheduler.schedule(actor)
+
+    def wake_actors_near(self, x: int, y: int, radius: int) -> None:
+        """Wake every dormant actor within `radius` tiles of (x, y).
+
+        Used for the player's presence and for noise. Only the tiles in range
+        are visited, so the cost does not grow with the number of sleepers.
+        """
+        if not self._dormant_actors:
+            return
+
+        x1, y1 = max(0, x - radius), max(0, y - radius)
+        area = self.dormant_count[x1 : x + radius + 1, y1 : y + radius + 1]
+        for area_x, area_y in zip(*(index.tolist() for index in area.nonzero())):
+            for entity in list(
+                    self.get_entities_at_location(x1 + area_x, y1 + area_y)):
+                if entity in self._dormant_actors:
+                    self.wake(entity)
+
+    def _unindex_location(self, entity: Entity) -> None:
+        location = (entity.x, entity.y)
+        entities_here = self._entities_by_location[location]
+        entities_here.remove(entity)
+        if not entities_here:
+            del self._entities_by_location[location]
+
+    def get_entities_at_location(self, x: int, y: int) -> List[Entity]:
+        """Return the entities at the given location, oldest first."""
+        return self._entities_by_location.get((x, y), [])
+
+    def update_fov(self, x: int, y: int, radius: int) -> bool:
+        """Set `visible` to the FOV from (x, y) and add it to `explored`.
+
+        Results are memoized on the origin, radius and tiles generation, and
+        nothing is touched if the FOV is the one already shown. Returns True
+        if `visible` changed.
+        """
+        key = (x, y, radius, self.tiles_generation)
+        if key == self._fov_key:
+            return False
+
+        visible = self._fov_cache.get(key)
+        if visible is None:
+            visible = compute_fov(
+                self.tiles["transparent"], (x, y), radius = radius)
+            self._fov_cache[key] = visible
+            if len(self._fov_cache) > FOV_CACHE_SIZE:
+                self._fov_cache.popitem(last = False)
+        else:
+            self._fov_cache.move_to_end(key)
+
+        self._fov_key = key
+        if np.array_equal(visible, self.visible):
+            return False
+
+        self.visible[:] = visible
+        # Add visible tiles to explored
+        self.explored |= visible
+        self.visible_generation += 1
+        return True
+
+    def get_movement_cost(self) -> np.ndarray:
+        """Return the pathfinding cost of entering each tile.
+
+        Tiles which cannot be walked on cost 0. Tiles held by blocking entities
+        cost more, to encourage other entities to take the longer path around.
+
+        The returned array is a buffer reused by the next call, so it must
+        not be kept around.
+        """
+        if self._base_cost_generation != self.tiles_generation:
+            self._base_cost = np.array(
+                self.tiles["walkable"], dtype = np.int8, order = "F")
+            self._base_cost_generation = self.tiles_generation
+        if self._cost_scratch is None:
+            self._cost_scratch = np.empty(
+                (self.width, self.height), dtype = np.int8, order = "F")
+
+        cost = self._cost_scratch
+        np.multiply(self.occupancy, 10, out = cost)
+        cost += 1
+        cost *= self._base_cost
+        return cost
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        """Return True if a movement-blocking entity stands on this tile."""
+        return bool(self.occupancy[x, y])
 
     def get_blocking_entity_at_location(
             self, location_x: int, location_y: int
             ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (entity.blocks_movement
-                    and entity.x == location_x
-                    and entity.y == location_y):
+        for entity in self.get_entities_at_location(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
 
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.get_entities_at_location(x, y):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
         
         return None
     
@@ -84,22 +401,51 @@ class GameMap:
 
         > Source: http://rogueliketutorials.com/tutorials/tcod/v2/part-4/
         """
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
-            default=tile_types.SHROUD,
-        )
+        # explored only changes along with visible
+        composite_key = (self.tiles_generation, self.visible_generation)
+        if composite_key != self._composite_key:
+            self._composite = np.select(
+                condlist=[self.visible, self.explored],
+                choicelist=[self.tiles["light"], self.tiles["dark"]],
+                default=tile_types.SHROUD,
+            )
+            self._composite_key = composite_key
 
-        entities_sorted_for_rendering = sorted(
-            self.entities, key = lambda x: x.render_order.value
-        )
+        console.tiles_rgb[0 : self.width, 0 : self.height] = self._composite
 
+        # The store's array writes are the normal path. Maps built without a
+        # store print their entities one by one instead.
+        if self.entity_store is not None:
+            self.render_entities_vectorized(console)
+            return
+
+        entities_sorted_for_rendering = sorted(
+            self.entities, key=lambda x: x.render_order.value
+            )
         for entity in entities_sorted_for_rendering:
             # Print entities in view
             if self.visible[entity.x, entity.y]:
                 console.print(x = entity.x, y = entity.y,
                               string = entity.char, fg = entity.colour)
 
+    def render_entities_vectorized(self, console: Console) -> None:
+        """Draw the glyphs of all entities in view straight into the console
+        tiles, one array write per render order.
+
+        Render orders are written lowest first, so later ones end up on top
+        of earlier ones on a shared tile, as with printing them one by one.
+        """
+        store = self.entity_store
+        rows_in_view = np.flatnonzero(store.visible_mask(self.visible))
+        render_orders = store.render_order[rows_in_view]
+
+        tiles = console.tiles_rgb
+        for render_order in RenderOrder:
+            rows = rows_in_view[render_orders == render_order.value]
+            xs, ys = store.x[rows], store.y[rows]
+            tiles["ch"][xs, ys] = store.ch[rows]
+            tiles["fg"][xs, ys] = store.fg[rows]
+
 
 class GameWorld:
     """
@@ -115,7 +461,9 @@ class GameWorld:
             max_rooms: int,
             room_min_size: int,
             room_max_size: int,
-            current_floor: int = 0
+            current_floor: int = 0,
+            use_room_mask: bool = False,
+            seed: Optional[int] = None,
             ):
         self.engine = engine
 
@@ -129,16 +477,77 @@ class GameWorld:
 
         self.current_floor = current_floor
 
-    def generate_floor(self) -> None:
-        from game.procgen import generate_dungeon
+        # Place rooms with procgen.RoomPlacer instead of random retries
+        self.use_room_mask = use_room_mask
 
-        self.current_floor += 1
+        # Master seed of the world. Every floor and subsystem draws from its
+        # own stream derived from it, see stream_seed.
+        self.seed = random.getrandbits(64) if seed is None else seed
+
+        # Map of the next floor being generated by a worker
+        self._next_floor: Optional[Future[GameMap]] = None
 
-        self.engine.game_map = generate_dungeon(
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # A pending pre-generation is dropped, the next floor is generated
+        # again from the seed if needed.
+        state["_next_floor"] = None
+        return state
+
+    def stream_seed(self, floor: int, stream: str) -> str:
+        """Return the seed of a floor's random stream, such as "layout"."""
+        return f"{self.seed}/{floor}/{stream}"
+
+    def _generate(self, floor: int) -> GameMap:
+        """Generate the map of the given floor from the world's seed."""
+        from game.procgen import generate_dungeon
+
+        game_map = generate_dungeon(
             max_rooms = self.max_rooms,
             room_min_size = self.room_min_size,
             room_max_size = self.room_max_size,
             map_width = self.map_width,
             map_height = self.map_height,
             engine = self.engine,
+            floor_number = floor,
+            layout_seed = self.stream_seed(floor, "layout"),
+            spawn_rng = random.Random(self.stream_seed(floor, "spawns")),
+            use_room_mask = self.use_room_mask,
         )
+        game_map.ai_rng = np.random.default_rng(
+            random.Random(self.stream_seed(floor, "ai")).getrandbits(128))
+        return game_map
+
+    def prefetch_next_floor(self) -> None:
+        """Start generating the floor below the current one in the background.
+
+        Floors only depend on the world's seed, so the same floor is
+        generated whether or not it was prepared ahead of time.
+        """
+        if self._next_floor is None:
+            self._next_floor = _floor_executor.submit(
+                self._generate, self.current_floor + 1)
+
+    def generate_floor(self) -> None:
+        """Move down to the next floor and place the player on it.
+
+        Uses the pre-generated map if the worker is done with it or already
+        busy on it, and generates the floor synchronously otherwise.
+        """
+        future, self._next_floor = self._next_floor, None
+
+        self.current_floor += 1
+
+        game_map = None
+        if future is not None and not future.cancel():
+            try:
+                game_map = future.result()
+            except Exception:
+                game_map = None  # Generate it again below
+        if game_map is None:
+            game_map = self._generate(self.current_floor)
+
+        self.engine.game_map = game_map
+        self.engine.player.place(*game_map.start_location, game_map)
+
+        self.prefetch_next_floor()
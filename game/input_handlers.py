@@ -93,6 +93,16 @@ class BaseEventHandler(tcod.event.EventDispatch[ActionOrHandler]):
     def on_render(self, console: tcod.Console) -> None:
         raise NotImplementedError()
 
+    def on_render_dirty(self, console: tcod.Console) -> bool:
+        """Bring a console still holding this handler's last frame up to date.
+
+        Returns True if anything was drawn, False if the frame is unchanged.
+        By default the whole frame is redrawn.
+        """
+        console.clear()
+        self.on_render(console)
+        return True
+
     def ev_quit(self, event: tcod.event.Quit) -> Optional[Action]:
         raise SystemExit()
 
@@ -151,15 +161,19 @@ class EventHandler(BaseEventHandler):
         if action is None:
             return False
 
+        timings = self.engine.timings
         try:
-            action.perform()
+            with timings.time("action"):
+                action.perform()
         except exceptions.Impossible as exc:
             self.engine.message_log.add_message(exc.args[0], colour.impossible)
             return False  # skip enemy turn on exceptions
 
-        self.engine.handle_enemy_turns()
+        with timings.time("enemy_turns"):
+            self.engine.handle_enemy_turns()
 
-        self.engine.update_fov()
+        with timings.time("update_fov"):
+            self.engine.update_fov()
         return True
 
     def ev_mousemotion(self, event: tcod.event.MouseMotion) -> None:
@@ -535,6 +549,10 @@ class AreaRangedAttackHandler(SelectIndexHandler):
 
 class MainGameEventHandler(EventHandler):
 
+    def on_render_dirty(self, console: tcod.Console) -> bool:
+        """Only redraw the screen regions whose inputs changed."""
+        return self.engine.render(console, dirty_only=True)
+
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
         action: Optional[Action] = None
 
@@ -576,6 +594,10 @@ class MainGameEventHandler(EventHandler):
         elif key == tcod.event.K_SLASH:
             return LookHandler(self.engine)
 
+        elif key == tcod.event.K_F3:
+            # Toggle the debug overlay of turn and frame timings
+            self.engine.show_timings = not self.engine.show_timings
+
         # No valid key was pressed
         return action
 
@@ -585,6 +607,8 @@ class GameOverEventHandler(EventHandler):
         """Handle exiting out of a finished game."""
         if os.path.exists("savegame.sav"):
             os.remove("savegame.sav")
+        if os.path.exists(self.engine.message_log.spill_filename):
+            os.remove(self.engine.message_log.spill_filename)
         raise exceptions.QuitWithoutSaving()
 
     def ev_quit(self, event: tcod.event.Quit) -> None:
@@ -606,7 +630,7 @@ class LogViewer(EventHandler):
 
     def __init__(self, engine: Engine, game_state: GameState):
         super().__init__(engine)
-        self.log_length = len(engine.message_log.messages)
+        self.log_length = len(engine.message_log)
         self.cursor = self.log_length - 1
         self.game_state = game_state
 
@@ -626,13 +650,13 @@ class LogViewer(EventHandler):
 
         # Render the message log using the cursor parameter
 
-        self.engine.message_log.render_messages(
+        self.engine.message_log.render_window(
             log_console,
             1,
             1,
             log_console.width - 2,
             log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
+            self.cursor,
             )
 
         log_console.blit(console, 3, 3)
@@ -1,19 +1,40 @@
 # game/message_log.py
 
 
-from typing import Iterable, List, Reversible, Tuple
+import bisect
+from collections import OrderedDict
+import lzma
+import pickle
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import textwrap
+import uuid
 
 import tcod
 
 from game import colour
 
 
+# Number of spilled chunks kept in memory once paged back in
+SPILL_CACHE_CHUNKS = 4
+
+
 class Message:
+    __slots__ = ("plain_text", "fg", "count", "_wrapped")
+
     def __init__(self, text:str, fg: Tuple[int, int, int]):
         self.plain_text = text
         self.fg = fg
         self.count = 1
+        # width -> (count when wrapped, wrapped lines)
+        self._wrapped: Dict[int, Tuple[int, List[str]]] = {}
+
+    def __getstate__(self) -> Tuple[str, Tuple[int, int, int], int]:
+        # Wrapped lines are a cache, don't save them
+        return self.plain_text, self.fg, self.count
+
+    def __setstate__(self, state: Tuple[str, Tuple[int, int, int], int]) -> None:
+        self.plain_text, self.fg, self.count = state
+        self._wrapped = {}
 
     @property
     def full_text(self) -> str:
@@ -22,10 +43,70 @@ class Message:
             return f"{self.plain_text} (x{self.count})"
         return self.plain_text
 
+    def wrapped(self, width: int) -> List[str]:
+        """Return the full text wrapped to `width`, cached until count changes."""
+        cached = self._wrapped.get(width)
+        if cached is None or cached[0] != self.count:
+            cached = self.count, list(MessageLog.wrap(self.full_text, width))
+            self._wrapped[width] = cached
+        return cached[1]
+
 
 class MessageLog:
-    def __init__(self) -> None:
-        self.messages: List[Message] = []
+    """
+    Holds the most recent messages in memory, up to `capacity`. Older
+    messages are spilled in compressed chunks of `spill_chunk_size` to the
+    append-only `spill_filename`, and paged back in when they are read.
+
+    Each log has its own `log_id`, which names its default spill file and is
+    written with every chunk, so a log never reads another game's history.
+
+    Messages are indexed from the start of the game, over both parts.
+    """
+
+    def __init__(
+            self,
+            capacity: int = 1000,
+            spill_chunk_size: int = 200,
+            spill_filename: Optional[str] = None,
+            ) -> None:
+        self.messages: List[Message] = []  # In-memory messages, oldest first
+        self.generation = 0  # Bumped whenever the log changes
+
+        self.capacity = capacity
+        self.spill_chunk_size = spill_chunk_size
+        self.log_id = uuid.uuid4().hex
+        self.spill_filename = spill_filename or f"savegame-{self.log_id}.log"
+        self.spilled_count = 0  # Messages moved out of memory
+        # (offset, size) of each spilled chunk in the spill file
+        self._spill_chunks: List[Tuple[int, int]] = []
+        # Spilled chunks paged back in, least recently used first
+        self._chunk_cache: OrderedDict[int, List[Message]] = OrderedDict()
+
+        # width -> number of wrapped lines before each in-memory message,
+        # plus the total. Extended lazily by line_offsets.
+        self._line_offsets: Dict[int, List[int]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Caches are rebuilt on demand after loading
+        state["_chunk_cache"] = OrderedDict()
+        state["_line_offsets"] = {}
+        return state
+
+    def __len__(self) -> int:
+        return self.spilled_count + len(self.messages)
+
+    def __getitem__(self, index: int) -> Message:
+        """Return a message by its index, paging it in if it was spilled."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index >= self.spilled_count:
+            return self.messages[index - self.spilled_count]
+        chunk = self._load_chunk(index // self.spill_chunk_size)
+        return chunk[index % self.spill_chunk_size]
 
     def add_message(
             self, 
@@ -45,8 +126,73 @@ class MessageLog:
 
         if stack and self.messages and text == self.messages[-1].plain_text:
             self.messages[-1].count += 1
+            # The stacked message may wrap differently now
+            for offsets in self._line_offsets.values():
+                if len(offsets) > len(self.messages):
+                    offsets.pop()
         else:
             self.messages.append(Message(text, fg))
+            if len(self.messages) > self.capacity:
+                self._spill()
+        self.generation += 1
+
+    def _spill(self) -> None:
+        """Move the oldest in-memory chunk of messages to the spill file."""
+        spilled = self.messages[: self.spill_chunk_size]
+        del self.messages[: self.spill_chunk_size]
+
+        # Chunks are tagged with their log and position, checked on loading
+        data = lzma.compress(pickle.dumps((
+            self.log_id,
+            len(self._spill_chunks),
+            [message.__getstate__() for message in spilled],
+            )))
+        # The first chunk of a log replaces whatever an older game left
+        with open(self.spill_filename, "ab" if self._spill_chunks else "wb") as f:
+            offset = f.tell()
+            f.write(data)
+        self._spill_chunks.append((offset, len(data)))
+        self.spilled_count += len(spilled)
+
+        for width, offsets in self._line_offsets.items():
+            if len(offsets) > len(spilled):
+                del offsets[: len(spilled)]
+            else:
+                self._line_offsets[width] = [0]
+
+    def _load_chunk(self, chunk_index: int) -> List[Message]:
+        """Return a spilled chunk of messages, reading it in if needed."""
+        chunk = self._chunk_cache.get(chunk_index)
+        if chunk is not None:
+            self._chunk_cache.move_to_end(chunk_index)
+            return chunk
+
+        offset, size = self._spill_chunks[chunk_index]
+        try:
+            with open(self.spill_filename, "rb") as f:
+                f.seek(offset)
+                log_id, index, states = pickle.loads(
+                    lzma.decompress(f.read(size)))
+            if (log_id, index) != (self.log_id, chunk_index):
+                raise ValueError("chunk belongs to another log")
+        except (
+                OSError, EOFError, ValueError, TypeError,
+                lzma.LZMAError, pickle.UnpicklingError,
+                ):
+            states = [
+                ("<message history unavailable>", colour.white, 1)
+                ] * self.spill_chunk_size
+
+        chunk = []
+        for state in states:
+            message = Message.__new__(Message)
+            message.__setstate__(state)
+            chunk.append(message)
+
+        self._chunk_cache[chunk_index] = chunk
+        if len(self._chunk_cache) > SPILL_CACHE_CHUNKS:
+            self._chunk_cache.popitem(last = False)
+        return chunk
 
     def render(
             self,
@@ -62,41 +208,99 @@ class MessageLog:
         the `console`.
         """
 
-        self.render_messages(console, x, y, width, height, self.messages)
+        self.render_window(console, x, y, width, height, len(self) - 1)
 
-    @staticmethod
-    def wrap(string: str, width: int) -> Iterable[str]:
-        """Return wrapped text message."""
-        for line in string.splitlines():
-            yield from textwrap.wrap(
-                line, width, expand_tabs=True,
-            )
+    def line_offsets(self, width: int) -> List[int]:
+        """Return the cumulative wrapped line index of the in-memory messages
+        at `width`.
+
+        Item `i` is the number of lines before in-memory message `i`, and the
+        last item is the total. Only differences between items are meaningful,
+        the first item is not always 0.
+        """
+        offsets = self._line_offsets.setdefault(width, [0])
+        for message in self.messages[len(offsets) - 1 :]:
+            offsets.append(offsets[-1] + len(message.wrapped(width)))
+        return offsets
+
+    def _messages_in_view(
+            self, width: int, height: int, last: int
+            ) -> Tuple[List[Message], int]:
+        """Return the messages with lines in a window of `height` lines ending
+        with message `last`, oldest first, and how many lines of the first
+        one are cut off at the top.
+        """
+        view: List[Message] = []
+        lines_needed = height
+        index = last
+
+        if last >= self.spilled_count:
+            # Find the first message in view with the cumulative line index
+            offsets = self.line_offsets(width)
+            local_last = last - self.spilled_count
+            start_line = offsets[local_last + 1] - height
+            if start_line >= offsets[0]:
+                first = bisect.bisect_right(offsets, start_line) - 1
+                return (
+                    self.messages[first : local_last + 1],
+                    start_line - offsets[first],
+                    )
+
+            # Everything in memory up to `last` fits, carry on into the
+            # spilled history
+            view = self.messages[: local_last + 1]
+            lines_needed = offsets[0] - start_line
+            index = self.spilled_count - 1
+
+        spilled_view = []
+        while lines_needed > 0 and index >= 0:
+            message = self[index]
+            spilled_view.append(message)
+            lines_needed -= len(message.wrapped(width))
+            index -= 1
+        spilled_view.reverse()
 
-    @classmethod
-    def render_messages(
-            cls,
+        return spilled_view + view, max(0, -lines_needed)
+
+    def render_window(
+            self,
             console: tcod.Console,
             x: int,
             y: int,
             width: int,
             height: int,
-            messages: Reversible[Message],
+            last: int,
             ) -> None:
-        """Render the messages provided.
-        The `messages` are rendered starting at the last message and working
-        backwards.
+        """Render the lines of the log which fit in the given area and end
+        with message index `last`.
+
+        Only the messages in view are visited, spilled ones are paged in.
         """
+        if last < 0:
+            return
 
-        y_offset = height - 1
+        view, skip = self._messages_in_view(width, height, last)
+        lines_in_view = sum(len(message.wrapped(width)) for message in view) - skip
 
-        for message in reversed(messages):
-            for line in reversed(list(cls.wrap(message.full_text, width))):
+        # Align the last line to the bottom of the area
+        y_offset = height - lines_in_view
+
+        for message in view:
+            # The first message in view may be cut off at the top
+            for line in message.wrapped(width)[skip:]:
                 console.print(
                     x = x,
                     y = y + y_offset,
                     string = line,
                     fg = message.fg
                     )
-                y_offset -= 1
-                if y_offset < 0:
-                    return  # out of space for messages
+                y_offset += 1
+            skip = 0
+
+    @staticmethod
+    def wrap(string: str, width: int) -> Iterable[str]:
+        """Return wrapped text message."""
+        for line in string.splitlines():
+            yield from textwrap.wrap(
+                line, width, expand_tabs=True,
+            )
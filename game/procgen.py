@@ -2,20 +2,29 @@
 
 from __future__ import annotations
 
+import functools
 import random
-from typing import Dict, Iterator, List, Tuple, TYPE_CHECKING
+from typing import Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
 
-import tcod
+import numpy as np
 
 from game import entity, entity_factories, tile_types
 
-from game.game_map import GameMap
+from game.entity import Actor
+from game.game_map import GameMap, tiles_checksum
 
 if TYPE_CHECKING:
     from game.engine import Engine
     from game.entity import Entity
 
 
+# Random corners RoomPlacer.sample tests before picking among the free ones
+ROOM_SAMPLE_ATTEMPTS = 8
+
+# Positions tried for each spawn before it is given up, when the earlier
+# ones were taken by another entity or the player's arrival cell
+MAX_SPAWN_ATTEMPTS = 8
+
 max_items_by_floor = [
     (1, 1),
     (4, 2),
@@ -62,33 +71,62 @@ def get_max_value_for_floor(
     return current_value
 
 
-def get_entities_at_random(
-        weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]],
-        number_of_entities: int,
-        floor: int,
-        ) -> List[Entity]:
-    entity_weighted_chances = {}
+class SpawnTable:
+    """
+    The entities which can spawn on one floor, with their cumulative weights.
+
+    Built once per floor from a chances table such as `enemy_chances`. The
+    table maps a minimum floor to (entity, weight) pairs, in increasing floor
+    order. Every entry whose minimum floor is at most `floor` applies, and a
+    later entry for the same entity replaces its earlier weight. An entity is
+    drawn with a probability proportional to its weight.
+    """
+
+    def __init__(
+            self,
+            weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]],
+            floor: int,
+            ):
+        entity_weighted_chances: Dict[Entity, int] = {}
+
+        for key, values in weighted_chances_by_floor.items():
+            if key > floor:
+                break
+            for entity, weighted_chance in values:
+                entity_weighted_chances[entity] = weighted_chance
 
-    for key, values in weighted_chances_by_floor.items():
-        if key > floor:
-            break
-        else:
-            for value in values:
-                entity = value[0]
-                weighted_chance = value[1]
+        self.entities: List[Entity] = list(entity_weighted_chances.keys())
+        self.cumulative_weights = np.cumsum(
+            list(entity_weighted_chances.values()), dtype=np.float64)
 
-                entity_weighted_chances[entity] = weighted_chance
+    def sample(self, generator: np.random.Generator, count: int) -> List[Entity]:
+        """Draw `count` entities at random with a single batched call."""
+        if count == 0 or not self.entities:
+            return []
 
-    entities = list(entity_weighted_chances.keys())
-    entity_weighted_chances_values = list(entity_weighted_chances.values())
+        draws = generator.random(count) * self.cumulative_weights[-1]
+        indices = np.searchsorted(self.cumulative_weights, draws, side="right")
+        return [self.entities[index] for index in indices.tolist()]
 
-    chosen_entities = random.choices(
-        entities,
-        weights=entity_weighted_chances_values,
-        k=number_of_entities,
-        )
 
-    return chosen_entities
+class FloorSpawns(NamedTuple):
+    """Spawn limits per room and spawn tables of one floor."""
+
+    max_monsters: int
+    max_items: int
+    monsters: SpawnTable
+    items: SpawnTable
+
+
+@functools.lru_cache(maxsize=None)
+def get_floor_spawns(floor: int) -> FloorSpawns:
+    """Return the spawn settings of a floor, computed once per floor."""
+    return FloorSpawns(
+        max_monsters = get_max_value_for_floor(max_monsters_by_floor, floor),
+        max_items = get_max_value_for_floor(max_items_by_floor, floor),
+        monsters = SpawnTable(enemy_chances, floor),
+        items = SpawnTable(item_chances, floor),
+        )
 
 
 class RectangularRoom:
@@ -117,104 +155,301 @@ class RectangularRoom:
             self.y2 >= other.y1
             )
 
+class RoomPlacer:
+    """
+    Samples positions for new rooms among those overlapping no placed room.
+
+    For every room size asked for, a boolean mask over the possible top-left
+    corners records which ones are still free, along with the number of free
+    corners in each column of the mask. Placing a room clears, in each mask,
+    the rectangle of corners that would make a room of that size intersect
+    it, at a cost proportional to the room's area.
+
+    Sampling first tries a few random corners, each tested with one lookup by
+    is_free. Once the free corners are too sparse for that, it picks one
+    through the column counts in O(width + height), never scanning the whole
+    mask.
+    """
+
+    def __init__(self, map_width: int, map_height: int):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.rooms: List[RectangularRoom] = []
+        self._free_corners: Dict[Tuple[int, int], np.ndarray] = {}
+        self._free_per_column: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def _corner_mask(self, width: int, height: int) -> np.ndarray:
+        """Return the free corner mask for rooms of this size."""
+        mask = self._free_corners.get((width, height))
+        if mask is None:
+            # Same corner range as the random placement in generate_dungeon
+            mask = np.ones(
+                (max(0, self.map_width - width), max(0, self.map_height - height)),
+                dtype=bool,
+                )
+            free_per_column = np.full(mask.shape[0], mask.shape[1], dtype=np.int64)
+            for room in self.rooms:
+                self._block(mask, free_per_column, width, height, room)
+            self._free_corners[width, height] = mask
+            self._free_per_column[width, height] = free_per_column
+        return mask
+
+    @staticmethod
+    def _block(
+            mask: np.ndarray,
+            free_per_column: np.ndarray,
+            width: int,
+            height: int,
+            room: RectangularRoom,
+            ) -> None:
+        """Clear the corners of rooms of this size which intersect `room`."""
+        columns = slice(max(0, room.x1 - width), room.x2 + 1)
+        rows = slice(max(0, room.y1 - height), room.y2 + 1)
+        free_per_column[columns] -= mask[columns, rows].sum(axis=1)
+        mask[columns, rows] = False
+
+    def is_free(self, x: int, y: int, width: int, height: int) -> bool:
+        """Return True if a room of this size fits at (x, y)."""
+        mask = self._corner_mask(width, height)
+        return 0 <= x < mask.shape[0] and 0 <= y < mask.shape[1] and bool(mask[x, y])
+
+    def sample(
+            self, width: int, height: int, rng: random.Random
+            ) -> Optional[RectangularRoom]:
+        """Return a room of this size at a random free position.
+
+        Returns None if a room of this size no longer fits anywhere.
+        """
+        mask = self._corner_mask(width, height)
+        if mask.size == 0:
+            return None
+
+        for _ in range(ROOM_SAMPLE_ATTEMPTS):
+            x = rng.randrange(mask.shape[0])
+            y = rng.randrange(mask.shape[1])
+            if self.is_free(x, y, width, height):
+                return RectangularRoom(x, y, width, height)
+
+        # Pick the n-th free corner: find its column, then its row
+        free_per_column = self._free_per_column[width, height]
+        free_before_column = np.cumsum(free_per_column)
+        if free_before_column[-1] == 0:
+            return None
+
+        n = rng.randrange(int(free_before_column[-1]))
+        x = int(np.searchsorted(free_before_column, n, side="right"))
+        if x > 0:
+            n -= int(free_before_column[x - 1])
+        y = int(np.flatnonzero(mask[x])[n])
+        return RectangularRoom(x, y, width, height)
+
+    def add(self, room: RectangularRoom) -> None:
+        """Mark the area of this room as taken."""
+        self.rooms.append(room)
+        for (width, height), mask in self._free_corners.items():
+            self._block(
+                mask, self._free_per_column[width, height], width, height, room)
+
+
 def place_entities(
-        room: RectangularRoom,
+        rooms: List[RectangularRoom],
         dungeon: GameMap,
         floor_number: int,
+        rng: random.Random,
         ) -> None:
-    number_of_monsters = random.randint(
-        0, get_max_value_for_floor(max_monsters_by_floor, floor_number),
-        )
-    number_of_items = random.randint(
-        0, get_max_value_for_floor(max_items_by_floor, floor_number),
-        )
-
-    monsters: List[Entity] = get_entities_at_random(
-        enemy_chances, number_of_monsters, floor_number,
-        )
-    items: List[Entity] = get_entities_at_random(
-        item_chances, number_of_items, floor_number,
-        )
-
-    for entity in monsters + items:
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
-
-        if not any(entity.x == x and entity.y == y
-                   for entity in dungeon.entities):    # Check for entity overlap
-            entity.spawn(dungeon, x, y)
+    """
+    Spawn the monsters and items of every room on a floor.
+
+    All of the floor's random draws are made in a few batched calls on a
+    NumPy Generator seeded from `rng`: the number of spawns per room, which
+    entities they are and where they land. Each spawn gets
+    MAX_SPAWN_ATTEMPTS candidate positions in its room and takes the first
+    free one, checked in O(1) against the map's location index.
+    """
+    if not rooms:
+        return
+
+    spawns = get_floor_spawns(floor_number)
+    generator = np.random.default_rng(rng.getrandbits(64))
+
+    number_of_monsters = generator.integers(
+        0, spawns.max_monsters, size=len(rooms), endpoint=True)
+    number_of_items = generator.integers(
+        0, spawns.max_items, size=len(rooms), endpoint=True)
+
+    monsters = spawns.monsters.sample(generator, int(number_of_monsters.sum()))
+    items = spawns.items.sample(generator, int(number_of_items.sum()))
+
+    # Room of each spawn, monsters first so they win overlaps with items
+    room_indices = np.concatenate((
+        np.repeat(np.arange(len(rooms)), number_of_monsters),
+        np.repeat(np.arange(len(rooms)), number_of_items),
+        ))
+    x1 = np.array([room.x1 for room in rooms])[room_indices]
+    y1 = np.array([room.y1 for room in rooms])[room_indices]
+    x2 = np.array([room.x2 for room in rooms])[room_indices]
+    y2 = np.array([room.y2 for room in rooms])[room_indices]
+    # Candidate positions, one row per spawn
+    shape = (MAX_SPAWN_ATTEMPTS, room_indices.size)
+    xs = generator.integers(x1 + 1, x2 - 1, size=shape, endpoint=True).T
+    ys = generator.integers(y1 + 1, y2 - 1, size=shape, endpoint=True).T
+
+    for entity, candidate_xs, candidate_ys in zip(
+            monsters + items, xs.tolist(), ys.tolist()):
+        for x, y in zip(candidate_xs, candidate_ys):
+            # Keep the cell the player arrives on free, and avoid overlaps
+            if (x, y) == dungeon.start_location:
+                continue
+            if dungeon.get_entities_at_location(x, y):
+                continue
+
+            spawned = entity.spawn(dungeon, x, y)
+            if isinstance(spawned, Actor):
+                # Monsters sleep until the player or noise comes near them
+                dungeon.put_to_sleep(spawned)
+            break
 
 
-def tunnel_between(
-        start: Tuple[int, int], end: Tuple[int, int]
-        ) -> Iterator[Tuple[int, int]]:
-    """Return an L-shaped tunnel between these two points"""
+def tunnel_segments(
+        start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
+        ) -> Tuple[Tuple[slice, slice], Tuple[slice, slice]]:
+    """
+    Return an L-shaped tunnel between these two points as its two legs.
 
+    The tunnel goes horizontally then vertically, or the other way round,
+    with even odds. Each leg is an axis-aligned 2D array index including both
+    of its ends, so a whole leg is carved with a single write.
+    """
     x1, y1 = start
     x2, y2 = end
 
-    if random.random() < 0.5:
+    if rng.random() < 0.5:
         # dig horizontal, then vertical
-        corner_x, corner_y = x2, y1
+        return (
+            (slice(min(x1, x2), max(x1, x2) + 1), slice(y1, y1 + 1)),
+            (slice(x2, x2 + 1), slice(min(y1, y2), max(y1, y2) + 1)),
+            )
     else:
         # dig vertical, then horizontal
-        corner_x, corner_y = x1, y2
+        return (
+            (slice(x1, x1 + 1), slice(min(y1, y2), max(y1, y2) + 1)),
+            (slice(min(x1, x2), max(x1, x2) + 1), slice(y2, y2 + 1)),
+            )
 
-    # Generate coordinates for the tunnel
-    for x, y in tcod.los.bresenham(start, (corner_x, corner_y)).tolist():
-        yield x, y
-    for x, y in tcod.los.bresenham((corner_x, corner_y), end).tolist():
-        yield x, y
 
+class Layout(NamedTuple):
+    """Everything needed to dig the rooms and tunnels of a floor again."""
 
-def generate_dungeon(
-        max_rooms: int,
-        room_min_size: int,
-        room_max_size: int,
-        map_width: int,
-        map_height: int,
-        engine: Engine) -> GameMap:
-    """Generate a new dungeon map"""
-    player = engine.player
-    dungeon = GameMap(engine, map_width, map_height, entities=[player])
+    seed: str  # Seed of the random.Random the layout is drawn from
+    max_rooms: int
+    room_min_size: int
+    room_max_size: int
+    use_room_mask: bool = False
+
+
+def dig_layout(dungeon: GameMap, layout: Layout) -> List[RectangularRoom]:
+    """Dig the rooms, tunnels and stairs of a layout into `dungeon`.
+
+    Draws only from a random.Random seeded with `layout.seed`, so a layout
+    always digs the same tiles on a map of the same size. Records the layout
+    and a checksum of the tiles it dug on the map, see GameMap.__getstate__.
+    Returns the rooms dug.
+    """
+    rng = random.Random(layout.seed)
+    room_placer = (
+        RoomPlacer(dungeon.width, dungeon.height) if layout.use_room_mask
+        else None)
 
     rooms: List[RectangularRoom] = []
 
     center_of_last_room = (0, 0)
 
-    for r in range(max_rooms):
+    for r in range(layout.max_rooms):
         # size
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = rng.randint(layout.room_min_size, layout.room_max_size)
+        room_height = rng.randint(layout.room_min_size, layout.room_max_size)
 
         # position
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
-        
-        new_room = RectangularRoom(x, y, room_width, room_height)
+        if room_placer is not None:
+            new_room = room_placer.sample(room_width, room_height, rng)
+            if new_room is None:
+                continue # No room of this size fits anymore
+            room_placer.add(new_room)
+        else:
+            x = rng.randint(0, dungeon.width - room_width - 1)
+            y = rng.randint(0, dungeon.height - room_height - 1)
+
+            new_room = RectangularRoom(x, y, room_width, room_height)
 
-        if any(new_room.intersects(other_room) for other_room in rooms):
-            continue # Intersection found, skip to the next attempt
+            if any(new_room.intersects(other_room) for other_room in rooms):
+                continue # Intersection found, skip to the next attempt
 
         # Dig
-        dungeon.tiles[new_room.inner] = tile_types.floor
+        dungeon.set_tiles(new_room.inner, tile_types.floor)
 
         if len(rooms) == 0:
-            # Starting room (place player here)
-            player.place(*new_room.center, dungeon)
+            # Starting room (the player arrives here)
+            dungeon.start_location = new_room.center
         else:
             # digging tunnels
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
+            for segment in tunnel_segments(
+                    rooms[-1].center, new_room.center, rng):
+                dungeon.set_tiles(segment, tile_types.floor)
 
             center_of_last_room = new_room.center
 
-        place_entities(new_room, dungeon, engine.game_world.current_floor)
-
-        dungeon.tiles[center_of_last_room] = tile_types.down_stairs
+        dungeon.set_tiles(center_of_last_room, tile_types.down_stairs)
         dungeon.downstairs_location = center_of_last_room
 
         # Add the new room to the rooms list
         rooms.append(new_room)
-    
+
+    dungeon.layout = layout
+    dungeon.layout_tiles_generation = dungeon.tiles_generation
+    dungeon.layout_checksum = tiles_checksum(dungeon.tiles)
+
+    return rooms
+
+
+def generate_layout_tiles(width: int, height: int, layout: Layout) -> np.ndarray:
+    """Return the tiles a layout digs on a map of the given size."""
+    scratch = GameMap(None, width, height, use_entity_store=False)
+    dig_layout(scratch, layout)
+    return scratch.tiles
+
+
+def generate_dungeon(
+        max_rooms: int,
+        room_min_size: int,
+        room_max_size: int,
+        map_width: int,
+        map_height: int,
+        engine: Engine,
+        floor_number: int,
+        layout_seed: str,
+        spawn_rng: random.Random,
+        use_room_mask: bool = False,
+        ) -> GameMap:
+    """Generate a new dungeon map.
+
+    The player is not placed on the map, the caller places them on its
+    `start_location`. The layout is drawn from `layout_seed` and the spawns
+    from `spawn_rng` only, and neither the engine nor the player is touched,
+    so maps can be generated off the main thread.
+
+    With `use_room_mask` rooms are placed by a RoomPlacer, which only tries
+    free positions, so large maps get close to `max_rooms` rooms quickly.
+    """
+    dungeon = GameMap(engine, map_width, map_height)
+
+    rooms = dig_layout(dungeon, Layout(
+        seed = layout_seed,
+        max_rooms = max_rooms,
+        room_min_size = room_min_size,
+        room_max_size = room_max_size,
+        use_room_mask = use_room_mask,
+        ))
+
+    place_entities(rooms, dungeon, floor_number, spawn_rng)
+
     return dungeon
@@ -0,0 +1,58 @@
+# game/profiling.py
+
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+import math
+import time
+from typing import Deque, Dict, Iterator
+
+
+class PhaseTimings:
+    """
+    Rolling wall-clock timings of the phases of a turn and a frame.
+
+    Only the last `window` samples of each phase are kept. Statistics are
+    reported in milliseconds.
+    """
+
+    def __init__(self, window: int = 240):
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """Time the body of a `with` block as one sample of `phase`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Add a sample, in seconds, to the given phase."""
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def stats(self, phase: str) -> Dict[str, float]:
+        """Return the min, mean and 99th percentile of a phase in
+        milliseconds, and the number of samples they cover.
+        """
+        samples = sorted(self.samples.get(phase, ()))
+        if not samples:
+            return {"min": 0.0, "mean": 0.0, "p99": 0.0, "count": 0}
+
+        p99_index = max(0, math.ceil(len(samples) * 0.99) - 1)
+        return {
+            "min": samples[0] * 1000,
+            "mean": sum(samples) / len(samples) * 1000,
+            "p99": samples[p99_index] * 1000,
+            "count": len(samples),
+        }
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Return the stats of every phase recorded so far."""
+        return {phase: self.stats(phase) for phase in self.samples}
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
     from tcod import Console
     from game.engine import Engine
     from game.game_map import GameMap
+    from game.profiling import PhaseTimings
 
 def get_names_at_location(
         x: int,
@@ -21,8 +22,7 @@ def get_names_at_location(
         return ""
 
     names = ", ".join(
-        entity.name for entity in game_map.entities
-        if  entity.x == x and entity.y == y
+        entity.name for entity in game_map.get_entities_at_location(x, y)
         )
 
     return names.capitalize()
@@ -86,4 +86,32 @@ def render_names_at_mouse_loc(
         game_map = engine.game_map
        )
     
-    console.print(x = x, y = y, string = names_at_mouse_location)
\ No newline at end of file
+    console.print(x = x, y = y, string = names_at_mouse_location)
+
+
+# Phases shown by the timings overlay, with their labels
+TIMING_PHASES = (
+    ("action", "act"),
+    ("enemy_turns", "enemy"),
+    ("update_fov", "fov"),
+    ("render", "draw"),
+    ("present", "flip"),
+    )
+
+
+def render_timings(
+        console: Console, timings: PhaseTimings, location: Tuple[int, int]
+        ) -> None:
+    """
+    Render one line per phase at the given location, holding the min, mean
+    and p99 time of that phase in milliseconds.
+    """
+    x, y = location
+
+    for i, (phase, label) in enumerate(TIMING_PHASES):
+        stats = timings.stats(phase)
+        line = (
+            f"{label:<5}{stats['min']:>4.1f}"
+            f"{stats['mean']:>5.1f}{stats['p99']:>5.1f}"
+            )
+        console.print(x = x, y = y + i, string = line, fg = colour.bar_text)
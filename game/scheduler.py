@@ -0,0 +1,72 @@
+# game/scheduler.py
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from game.entity import Actor
+
+
+# Energy spent by a single action. An actor regains its `speed` in energy per
+# tick, so an actor with speed 100 acts every 100 ticks, one with speed 200
+# acts twice as often and one with speed 50 half as often.
+ACTION_COST = 10_000
+
+
+def action_delay(speed: int) -> int:
+    """Return the number of ticks until an actor with this speed acts again."""
+    return max(1, ACTION_COST // max(1, speed))
+
+
+class TurnScheduler:
+    """
+    Orders actor turns on a heap keyed on the tick of their next action.
+
+    Ties are broken by scheduling order, so turn order is deterministic.
+    Each actor has at most one live entry; rescheduling or unscheduling an
+    actor leaves its old heap entry behind to be skipped when popped.
+    """
+
+    def __init__(self) -> None:
+        self.time = 0
+        self._queue: List[Tuple[int, int, Actor]] = []
+        self._sequence = 0
+        self._entries: Dict[Actor, int] = {}  # Actor -> sequence of live entry
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, actor: Actor, delay: Optional[int] = None) -> None:
+        """Schedule the next turn of this actor, replacing any earlier one.
+
+        `delay` defaults to the time this actor needs for one action.
+        """
+        if delay is None:
+            delay = action_delay(actor.speed)
+
+        sequence = self._sequence
+        self._sequence += 1
+        self._entries[actor] = sequence
+        heapq.heappush(self._queue, (self.time + delay, sequence, actor))
+
+    def unschedule(self, actor: Actor) -> None:
+        """Cancel the next turn of this actor, if it has one."""
+        self._entries.pop(actor, None)
+
+    def pop(self) -> Optional[Actor]:
+        """Advance time to the next turn and return the actor taking it.
+
+        Returns None if no actor is scheduled.
+        """
+        while self._queue:
+            time, sequence, actor = heapq.heappop(self._queue)
+            if self._entries.get(actor) == sequence:
+                del self._entries[actor]
+                self.time = time
+                return actor
+        return None
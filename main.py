@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 # main.py
 
+from contextlib import nullcontext
 import traceback
+from typing import ContextManager, Optional
 
 import tcod
 
@@ -16,6 +18,15 @@ def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
         print("Game saved.")
 
 
+def time_phase(
+        handler: input_handlers.BaseEventHandler, phase: str
+        ) -> ContextManager[None]:
+    """Time a phase of the frame if the current handler has an active Engine."""
+    if isinstance(handler, input_handlers.EventHandler):
+        return handler.engine.timings.time(phase)
+    return nullcontext()
+
+
 def main() -> None:
     screen_width = 80
     screen_height = 50
@@ -34,15 +45,30 @@ def main() -> None:
     ) as context:
         root_console = tcod.Console(screen_width, screen_height, order="F")
 
+        # Type of the handler which drew the frame held by root_console, the
+        # same type can update that frame instead of drawing a new one.
+        rendered_by: Optional[type] = None
+
         try:
             while True:
-                root_console.clear()
-                handler.on_render(console = root_console)
-                context.present(root_console)
+                with time_phase(handler, "render"):
+                    if type(handler) is rendered_by:
+                        frame_changed = handler.on_render_dirty(console = root_console)
+                    else:
+                        root_console.clear()
+                        handler.on_render(console = root_console)
+                        frame_changed = True
+                rendered_by = type(handler)
+
+                if frame_changed:
+                    with time_phase(handler, "present"):
+                        context.present(root_console)
 
                 try:
                     for event in tcod.event.wait():
                         context.convert_event(event)
+                        if isinstance(event, tcod.event.WindowEvent):
+                            rendered_by = None  # Redraw and present in full
                         handler = handler.handle_events(event)
                 except Exception:
                     traceback.print_exc() # print to stderr
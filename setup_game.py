@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import copy
 import lzma
 import pickle
 import traceback
@@ -19,8 +18,11 @@ from game import colour, entity_factories, input_handlers
 background_image = tcod.image.load("data/menu_background.png")[:, :, :3]
 
 
-def new_game() -> Engine:
-    """Return a brand new game session as an Engine instance."""
+def new_game(seed: Optional[int] = None) -> Engine:
+    """Return a brand new game session as an Engine instance.
+
+    The world is generated from `seed`, or from a random one if it is None.
+    """
 
     map_width = 80
     map_height = 43
@@ -29,7 +31,7 @@ def new_game() -> Engine:
     room_min_size = 6
     max_rooms = 30
 
-    player = copy.deepcopy(entity_factories.player)
+    player = entity_factories.player.clone()
 
     engine = Engine(player=player)
 
@@ -40,6 +42,7 @@ def new_game() -> Engine:
         room_max_size = room_max_size,
         map_width = map_width,
         map_height = map_height,
+        seed = seed,
         )
 
     engine.game_world.generate_floor()
@@ -49,8 +52,8 @@ def new_game() -> Engine:
         "Hello and welcome to yet another dungeon!", colour.welcome_text
     )
 
-    dagger = copy.deepcopy(entity_factories.dagger)
-    leather_armor = copy.deepcopy(entity_factories.leather_armor)
+    dagger = entity_factories.dagger.clone()
+    leather_armor = entity_factories.leather_armor.clone()
 
     dagger.parent = player.inventory
     leather_armor.parent = player.inventory
@@ -69,6 +72,7 @@ def load_game(filename: str) -> Engine:
     with open(filename, "rb") as f:
         engine = pickle.loads(lzma.decompress(f.read()))
     assert isinstance(engine, Engine)
+    engine.game_world.prefetch_next_floor()
     return engine
 
 